@@ -7,12 +7,14 @@ to local text files. No SQL Server required — demonstrates the scraping logic
 Source: https://www.presidency.ucsb.edu
 """
 
-import requests
-from requests.exceptions import RequestException
-from lxml import html
+import asyncio
+import aiohttp
+from concurrent.futures import ProcessPoolExecutor
+from lxml import etree
+import io
 import os
-import time
 import logging
+from rate_limit import RETRY_STATUSES, TokenBucket, backoff_delay, rate_limit_delay
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +24,9 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; SOTUScraper/1.0)'}
+MAX_CONCURRENT_REQUESTS = 8  # Politeness cap on simultaneous requests to the site
+MAX_FETCH_ATTEMPTS = 3  # Tries per speech before giving up
+_FILENAME_TABLE = str.maketrans({' ': '_', ',': None})  # File name clean-up, built once
 
 # Demo targets: 3 speeches spanning US history
 DEMO_SPEECHES = [
@@ -43,25 +48,67 @@ DEMO_SPEECHES = [
 ]
 
 
-def scrape_speech(url):
-    """Fetches and extracts speech text from a UCSB Presidency Project page."""
-    response = requests.get(url, headers=HEADERS, timeout=30)
-    response.raise_for_status()
-    tree = html.fromstring(response.content)
-    p_tags = tree.xpath('//div[contains(@class,"field-docs-content")]//p')
-    return '\n'.join([p.text_content().strip() for p in p_tags])
+async def scrape_speech(session, semaphore, bucket, pool, url):
+    """Fetches a UCSB Presidency Project page and extracts its speech text in the process pool."""
+    content = await fetch_bytes(session, semaphore, bucket, url)
+    return await asyncio.wrap_future(pool.submit(parse_speech, content))
+
+
+async def fetch_bytes(session, semaphore, bucket, url):
+    """Downloads a page body, retrying connection errors and rate-limit responses with backoff."""
+    async with semaphore:
+        for attempt in range(MAX_FETCH_ATTEMPTS):
+            await bucket.acquire_async()  # Rate limit
+            try:
+                async with session.get(url) as response:
+                    # Slow every request down if the server signals it is rate limiting us
+                    delay = rate_limit_delay(response.headers)
+                    if response.status in RETRY_STATUSES and attempt < MAX_FETCH_ATTEMPTS - 1:
+                        bucket.throttle(delay or backoff_delay(attempt))
+                        continue
+                    if delay:
+                        bucket.throttle(delay)
+                    response.raise_for_status()
+                    content = await response.read()
+                break
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == MAX_FETCH_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+    return content
+
+
+def parse_speech(content):
+    """Extracts the speech text from a UCSB Presidency Project page body. Runs in a worker process."""
+    # Stream the page one <p> at a time so only the current paragraph is kept in memory
+    paragraphs = []
+    context = etree.iterparse(io.BytesIO(content), events=('end',), tag='p', html=True,
+                              encoding='utf-8', remove_comments=True)
+    for _, elem in context:
+        if in_speech_body(elem):
+            paragraphs.append(''.join(elem.itertext()).strip())
+        # Free the paragraph and everything parsed before it
+        elem.clear()
+        while elem.getprevious() is not None:
+            del elem.getparent()[0]
+    return '\n'.join(paragraphs)
+
+
+def in_speech_body(elem):
+    """Checks whether an element sits inside the UCSB speech text container."""
+    return any('field-docs-content' in (div.get('class') or '') for div in elem.iterancestors('div'))
 
 
 def save_speech(output_dir, president, date, text):
     """Saves a speech to a text file and returns the file path."""
-    clean_name = f"{president} ({date})".replace(',', '').replace(' ', '_')
+    clean_name = f"{president} ({date})".translate(_FILENAME_TABLE)
     file_path = os.path.join(output_dir, f"{clean_name}.txt")
     with open(file_path, 'w', encoding='utf-8') as f:
         f.write(text)
     return file_path
 
 
-def main():
+async def main():
     logger.info("State of the Union Web Scraper — Demo Mode")
     logger.info(f"Scraping {len(DEMO_SPEECHES)} speeches (no SQL Server needed)\n")
 
@@ -71,19 +118,29 @@ def main():
 
     results = []
 
-    for speech_info in DEMO_SPEECHES:
+    # Fetch all speeches concurrently, bounded by the semaphore
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    bucket = TokenBucket(rate=2.0, capacity=5)
+    timeout = aiohttp.ClientTimeout(total=30)
+    connector = aiohttp.TCPConnector(limit_per_host=MAX_CONCURRENT_REQUESTS)  # Pooled keep-alive connections
+    # Parse in separate processes so text extraction for long speeches runs on all cores
+    pool_size = min(os.cpu_count() or 1, len(DEMO_SPEECHES))
+    with ProcessPoolExecutor(max_workers=pool_size) as pool:
+        async with aiohttp.ClientSession(headers=HEADERS, timeout=timeout, connector=connector) as session:
+            for speech_info in DEMO_SPEECHES:
+                logger.info(f"Scraping: {speech_info['president']} ({speech_info['date']})")
+            tasks = [scrape_speech(session, semaphore, bucket, pool, s['url']) for s in DEMO_SPEECHES]
+            texts = await asyncio.gather(*tasks, return_exceptions=True)
+
+    for speech_info, text in zip(DEMO_SPEECHES, texts):
         president = speech_info['president']
         date_str = speech_info['date']
-        url = speech_info['url']
 
-        logger.info(f"Scraping: {president} ({date_str})")
-
-        time.sleep(1)  # Rate limit
-        try:
-            text = scrape_speech(url)
-        except RequestException as e:
-            logger.error(f"Failed to fetch speech for {president}: {e}")
+        if isinstance(text, (aiohttp.ClientError, asyncio.TimeoutError)):
+            logger.error(f"Failed to fetch speech for {president}: {text}")
             continue
+        if isinstance(text, BaseException):
+            raise text
 
         if not text.strip():
             logger.warning(f"No speech content found for {president}")
@@ -112,7 +169,7 @@ def main():
 
 if __name__ == '__main__':
     try:
-        main()
+        asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Demo interrupted by user.")
     except Exception as e:
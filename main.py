@@ -1,15 +1,24 @@
 # Required Libraries
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.exceptions import HTTPError as URLLib3Error
+from urllib3.util.retry import Retry
 from lxml import html
 from lxml import etree
+from lxml.cssselect import CSSSelector
 import os
 import re
+import string
+import tempfile
 import time
+import threading
 import logging
 import pyodbc
 from urllib.parse import urljoin
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from rate_limit import RETRY_STATUSES, TokenBucket, backoff_delay, rate_limit_delay
+import datetime
 
 # Configure logging
 logging.basicConfig(
@@ -23,18 +32,138 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; SOTUScraper/1.0)'}
+INSERT_BATCH_SIZE = 500  # Rows buffered before each executemany flush
+MAX_WORKERS = 8  # Speech pages fetched concurrently
+MAX_FETCH_ATTEMPTS = 3  # Tries per page request before the error is raised
+DEDUP_CHUNK_SIZE = 1000  # Keys per duplicate check query; 2 parameters per key stays under SQL Server's 2100-parameter cap
+
+# Folder for BULK INSERT data files; it must be readable by the SQL Server service. Unset disables BULK INSERT.
+BULK_INSERT_DIR = os.environ.get('SQL_BULK_DIR')
+BULK_FIELD_TERMINATOR = '|~|'
+BULK_ROW_TERMINATOR = '|~~|'
+
+# Shared HTTP session: keeps connections alive across requests and retries server errors.
+# Connection errors and rate-limit statuses are retried in get_with_retries, where they can pause every worker.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_adapter = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(total=3, connect=0, read=0, backoff_factor=0.5, status_forcelist=(500, 502, 504)),
+)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
+# Selectors compiled once and reused for every page
+INDEX_LINKS_SELECTOR = CSSSelector('div > dl > dt > span > a')
+ARTICLE_P_XPATH = etree.XPath('//article/div/div/p')
+
+# Reusable parser; dropping comments shrinks the DOM the XPath queries walk,
+# and skipping the per-document ID table saves work nothing here would use.
+# Blank text is kept: libxml2 drops whitespace after <br>/<sup> and would run words together.
+HTML_PARSER = html.HTMLParser(encoding='utf-8', remove_comments=True, collect_ids=False)
+_thread_local = threading.local()  # Holds each worker thread's copy of HTML_PARSER
+
+# Index dates such as "January 8th, 1790": month name, day with optional ordinal suffix, year
+DATE_RE = re.compile(r'([A-Za-z]+)\s+(\d{1,2})(?:st|nd|rd|th)?,\s*(\d{4})')
+MONTHS = {
+    'January': 1, 'February': 2, 'March': 3, 'April': 4, 'May': 5, 'June': 6,
+    'July': 7, 'August': 8, 'September': 9, 'October': 10, 'November': 11, 'December': 12,
+}
+
+# File name clean-up table, built once
+_FILENAME_TABLE = str.maketrans({' ': '_', ',': None})
+
+# Characters allowed in SQL identifiers
+_SQL_IDENTIFIER_CHARS = frozenset(string.ascii_letters + string.digits + '_')
+
+# Separator written after each speech in the combined file
+_SEP = b"\n\n" + b"-" * 80 + b"\n\n"
+
+# Shared by all worker threads so the site sees one combined request rate
+REQUEST_BUCKET = TokenBucket(rate=2.0, capacity=5)
 
 
 def validate_sql_identifier(identifier, identifier_type="identifier"):
     """Validates that a SQL identifier contains only safe characters (alphanumeric and underscores)."""
-    if not re.match(r'^[A-Za-z0-9_]+$', identifier):
+    if not identifier or not set(identifier) <= _SQL_IDENTIFIER_CHARS:
         raise ValueError(f"Invalid SQL {identifier_type}: '{identifier}'. Only alphanumeric characters and underscores are allowed.")
 
 
-def record_exists(cursor, table, name, date):
-    """Checks if a record with the given president name and date already exists."""
-    cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE NAME_OF_PRESIDENT = ? AND DATE_OF_UNION_ADDRESS = ?", (name, str(date)))
-    return cursor.fetchone()[0] > 0
+def parse_address_date(date_str):
+    """Converts an index date such as "January 8th, 1790" to a date object. Raises ValueError if it doesn't parse."""
+    match = DATE_RE.fullmatch(date_str.strip())
+    if not match or match[1] not in MONTHS:
+        raise ValueError(f"Unrecognized date: '{date_str}'")
+    return datetime.date(int(match[3]), MONTHS[match[1]], int(match[2]))
+
+
+def get_html_parser():
+    """Returns this thread's copy of HTML_PARSER, since lxml serializes concurrent use of a single parser."""
+    parser = getattr(_thread_local, 'html_parser', None)
+    if parser is None:
+        parser = _thread_local.html_parser = HTML_PARSER.copy()
+    return parser
+
+
+def get_with_retries(url, read_response, **kwargs):
+    """Sends a rate-limited GET through the shared session and returns `read_response(response)` for a successful reply.
+
+    Connection errors, timeouts, and 429/503 replies are retried with backoff; 429/503 also pause every worker.
+    Reading the body happens inside the retry loop, so a connection dropped mid-body is retried too.
+    """
+    for attempt in range(MAX_FETCH_ATTEMPTS):
+        REQUEST_BUCKET.acquire()  # Rate limit between requests
+        try:
+            with SESSION.get(url, timeout=30, **kwargs) as response:
+                # Slow every worker down if the server signals it is rate limiting us
+                delay = rate_limit_delay(response.headers)
+                if response.status_code in RETRY_STATUSES and attempt < MAX_FETCH_ATTEMPTS - 1:
+                    REQUEST_BUCKET.throttle(delay or backoff_delay(attempt))
+                    continue
+                if delay:
+                    REQUEST_BUCKET.throttle(delay)
+                response.raise_for_status()
+                return read_response(response)
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, URLLib3Error):
+            if attempt == MAX_FETCH_ATTEMPTS - 1:
+                raise
+            time.sleep(backoff_delay(attempt))
+
+
+def parse_streamed_page(response):
+    """Parses a streamed response body straight from the socket and returns the root element, or None if empty."""
+    response.raw.decode_content = True  # Let urllib3 undo any gzip/deflate encoding
+    return html.parse(response.raw, parser=get_html_parser()).getroot()
+
+
+def fetch_speech_text(url):
+    """Fetches a speech page and returns the text of its paragraphs. Runs in a worker thread."""
+    # Stream the body straight into the parser instead of buffering the whole page first
+    speech_tree = get_with_retries(url, parse_streamed_page, stream=True)
+
+    # An empty body has no root element; report it as a page without speech text
+    if speech_tree is None:
+        return ''
+
+    # Join the text of all <p> tags containing the speech
+    return '\n'.join(p.text_content().strip() for p in ARTICLE_P_XPATH(speech_tree))
+
+
+def fetch_existing_records(cursor, table, keys):
+    """Returns which of the given (president name, ISO date) keys are already stored, using one query per chunk of keys."""
+    existing = set()
+    for start in range(0, len(keys), DEDUP_CHUNK_SIZE):
+        chunk = keys[start:start + DEDUP_CHUNK_SIZE]
+        placeholders = ', '.join(['(?, ?)'] * len(chunk))
+        cursor.execute(f"""
+            SELECT t.NAME_OF_PRESIDENT, CONVERT(VARCHAR(10), t.DATE_OF_UNION_ADDRESS, 23)
+            FROM {table} AS t
+            JOIN (VALUES {placeholders}) AS k (NAME_OF_PRESIDENT, DATE_OF_UNION_ADDRESS)
+                ON t.NAME_OF_PRESIDENT = k.NAME_OF_PRESIDENT AND t.DATE_OF_UNION_ADDRESS = k.DATE_OF_UNION_ADDRESS;
+            """, [value for key in chunk for value in key])
+        existing.update((name, date) for name, date in cursor.fetchall())
+    return existing
 
 
 # Main program starts here
@@ -65,14 +194,12 @@ def main():
 
     # Get main page content to parse
     try:
-        page = requests.get(speeches_url, headers=HEADERS, timeout=30)
-        page.raise_for_status()
-    except RequestException as e:
+        page_content = get_with_retries(speeches_url, lambda response: response.content)
+    except (RequestException, URLLib3Error) as e:
         logger.critical(f"Failed to fetch main speeches page: {e}")
         return
 
-    tree = html.fromstring(page.content)
-    html_etree = etree.ElementTree(tree)
+    tree = html.document_fromstring(page_content, parser=get_html_parser())
 
     # Create output directory for speech text files
     output_directory = os.path.join(os.getcwd(), 'SpeechFiles')
@@ -80,78 +207,100 @@ def main():
 
     # Create the combined speeches file
     combined_speeches_file = os.path.join("CombinedStateOfUnionAddresses.txt")
+    combined_parts = []  # Encoded speeches, written to the combined file in one go after scraping
     broken_links = []  # Track broken links
-    with open(combined_speeches_file, 'w', encoding='utf-8') as combined_file:
-
-        # Navigate Xpath to the tag with union addresses
-        speech_links = html_etree.xpath('//*//div/dl/dt/span/a')
-
-        # Iterate over each speech element and extract the information
-        for speech in speech_links:
-            # Extract president's name, date, and link to the speech
-            full_speech_text = speech.text.strip()
-            relative_link = speech.get('href')  # Get the relative URL for the speech
-            full_link = urljoin(main_url, relative_link)  # Combine base URL with the relative link
-
-            if '(' in full_speech_text and ')' in full_speech_text:
-                # Split based on the last '(' to separate president and date
-                president, date = full_speech_text.rsplit('(', 1)
-                president = president.strip()
-                date = date.strip(')')
-
-                # Handle different date formats and convert to a standardized format
-                try:
-                    date = date.replace('th', '').replace('st', '').replace('nd', '').replace('rd', '').strip()  # Remove suffixes
-                    date = datetime.strptime(date, "%B %d, %Y").date()  # Convert to date object
-                except ValueError:
-                    continue  # Skip if the date format is incorrect
-            else:
-                continue
-
-            # Check for duplicate before scraping
+    pending_rows = []  # Rows waiting for the next batched insert
+
+    # Select the links to the union addresses
+    speech_links = INDEX_LINKS_SELECTOR(tree)
+
+    # Collect the president, date, and link of every speech listed on the index page
+    candidates = []
+    for speech in speech_links:
+        # Extract president's name, date, and link to the speech
+        full_speech_text = speech.text.strip()
+        relative_link = speech.get('href')  # Get the relative URL for the speech
+        full_link = urljoin(main_url, relative_link)  # Combine base URL with the relative link
+
+        if '(' in full_speech_text and ')' in full_speech_text:
+            # Split based on the last '(' to separate president and date
+            president, date = full_speech_text.rsplit('(', 1)
+            president = president.strip()
+            date = date.strip(')')
+
+            # Handle different date formats and convert to a standardized format
             try:
-                if record_exists(cursor, table, president, date):
-                    logger.warning(f"Duplicate skipped: {president} ({date})")
-                    continue
-            except Exception:
-                pass  # If check fails, proceed with insertion
+                date = parse_address_date(date)  # Convert to date object, ignoring ordinal suffixes
+            except ValueError:
+                continue  # Skip if the date format is incorrect
+        else:
+            continue
+
+        candidates.append((president, date, full_link))
+
+    # Look up which listed speeches are already stored, in one query rather than one per speech
+    try:
+        existing_records = fetch_existing_records(
+            cursor, table, [(president, date.isoformat()) for president, date, _ in candidates])
+    except Exception as e:
+        logger.warning(f"Failed to check for existing records, duplicates will be caught on insert: {e}")
+        existing_records = set()
+
+    # Check for duplicates before scraping
+    jobs = []
+    for president, date, full_link in candidates:
+        record_key = (president, date.isoformat())
+        if record_key in existing_records:
+            logger.warning(f"Duplicate skipped: {president} ({date})")
+            continue
+        existing_records.add(record_key)
+        jobs.append((president, date, full_link))
+
+    # Fetch and parse speeches in worker threads; file and database work stay on this thread
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    try:
+        futures = [executor.submit(fetch_speech_text, full_link) for _, _, full_link in jobs]
 
+        # Consume results in index order so the combined file keeps the page's ordering
+        for (president, date, full_link), future in zip(jobs, futures):
             # Log a processing message
             logger.info(f"Processing speech for {president} ({date})")
 
             # Extract the speech content from the speech link
-            time.sleep(1)  # Rate limit between requests
             try:
-                speech_response = requests.get(full_link, headers=HEADERS, timeout=30)
-                speech_response.raise_for_status()
-            except RequestException as e:
+                speech_text = future.result()
+            except (RequestException, URLLib3Error, etree.LxmlError) as e:
                 logger.error(f"Failed to fetch speech for {president} ({date}): {e}")
                 broken_links.append((president, date, full_link))
                 continue
 
-            speech_tree = html.fromstring(speech_response.content)
-
-            # Find all <p> tags containing the speech text and join their content
-            p_tags = speech_tree.xpath('//*/article/div/div/p')
-            speech_text = '\n'.join([p.text_content().strip() for p in p_tags])
-
             # Check if the speech text is empty (broken link)
             if not speech_text.strip():
                 logger.warning(f"No speech found for {president} ({date})")
                 broken_links.append((president, date, full_link))
 
                 # Insert NULL values for FILENAME_ADDRESS and TEXT_OF_ADDRESS
-                insert_row_into_table(cursor, table, president, date, full_link, 'NULL', 'NULL')
+                insert_row_into_table(cursor, table, pending_rows, president, date, full_link, 'NULL', 'NULL')
                 continue
 
             # Saving speech text to a local file
             filename = write_to_file(output_directory, f"{president} ({date})", speech_text)
 
-            # Insert the data into the SQL Server database
-            insert_row_into_table(cursor, table, president, date, full_link, filename, speech_text)
+            # Queue the data for a batched insert into the SQL Server database
+            insert_row_into_table(cursor, table, pending_rows, president, date, full_link, filename, speech_text)
+
+            # Append the speech to the combined speeches file contents
+            combined_parts.extend((f"{president} ({date})\n\n".encode('utf-8'), speech_text.encode('utf-8'), _SEP))
+    finally:
+        # Drop fetches that haven't started so an early exit doesn't keep scraping pages nobody will read
+        executor.shutdown(wait=False, cancel_futures=True)
 
-            # Append the speech to the combined speeches file
-            combined_file.write(f"{president} ({date})\n\n{speech_text}\n\n{'-'*80}\n\n")
+        # Insert the final partial batch, keeping whatever was scraped even if the loop stopped early
+        flush_rows_into_table(cursor, table, pending_rows)
+
+        # Write the combined speeches file in a single pass
+        with open(combined_speeches_file, 'wb') as combined_file:
+            combined_file.writelines(combined_parts)
 
     # Success message for records stored in database
     logger.info("Records stored in the SQL database.")
@@ -197,29 +346,98 @@ def connect_to_sql_server(server, database, table):
     END
     """)
 
+    # Send inserts as one parameter array per batch and commit once per batch
+    odbc_conn.autocommit = False
+    cursor.fast_executemany = True
+
     return cursor
 
-def insert_row_into_table(cursor, table, name, date, link, file, text):
-    """Inserts a single union address into the SQL Server database. Returns True if inserted, False if skipped."""
+def insert_row_into_table(cursor, table, pending_rows, name, date, link, file, text):
+    """Queues a single union address for insertion and flushes the batch once it is full."""
+    pending_rows.append((name, str(date), link, file, text))
+    if len(pending_rows) >= INSERT_BATCH_SIZE:
+        flush_rows_into_table(cursor, table, pending_rows)
+
+def flush_rows_into_table(cursor, table, pending_rows):
+    """Inserts all queued union addresses in one batch, retrying row by row if any row in the batch fails."""
+    if not pending_rows:
+        return
+
+    # Prefer a single bulk load; fall back to parameterized inserts if the server can't read the data file
+    if bulk_insert_rows(cursor, table, pending_rows):
+        pending_rows.clear()
+        return
 
+    insert_sql = f"""
+        INSERT INTO {table} (NAME_OF_PRESIDENT, DATE_OF_UNION_ADDRESS, LINK_TO_ADDRESS, FILENAME_ADDRESS, TEXT_OF_ADDRESS)
+        VALUES (?, ?, ?, ?, ?);
+        """
     try:
-        # Insert the speech data into the table using parameterized query
+        # Insert the whole batch using parameterized query
+        cursor.executemany(insert_sql, pending_rows)
+        cursor.commit()
+    except Exception as e:
+        # One bad row (duplicate, oversized value, ...) aborts the whole batch, so fall back to single-row inserts
+        cursor.rollback()
+        logger.warning(f"Batch insert of {len(pending_rows)} records failed, retrying one at a time: {e}")
+        for row in pending_rows:
+            name, date = row[0], row[1]
+            try:
+                cursor.execute(insert_sql, row)
+            except pyodbc.IntegrityError:
+                logger.warning(f"Duplicate record skipped during insert: {name} ({date})")
+            except Exception as e:
+                logger.error(f"Failed to insert record for {name} ({date}): {e}")
+        try:
+            cursor.commit()
+        except pyodbc.Error as e:
+            logger.error(f"Failed to commit records: {e}")
+    pending_rows.clear()
+
+def bulk_insert_rows(cursor, table, rows):
+    """Loads rows into the table with BULK INSERT from a UTF-16 data file in SQL_BULK_DIR. Returns False if not loaded."""
+    # Without a folder the server can read, the load can't succeed
+    if not BULK_INSERT_DIR:
+        return False
+
+    # Rows containing a terminator would be split in the wrong place
+    terminators = (BULK_FIELD_TERMINATOR, BULK_ROW_TERMINATOR)
+    if any(terminator in value for row in rows for value in row for terminator in terminators):
+        return False
+
+    data_path = None
+    try:
+        fd, data_path = tempfile.mkstemp(suffix='.dat', dir=BULK_INSERT_DIR)
+        with os.fdopen(fd, 'w', encoding='utf-16', newline='') as data_file:
+            for row in rows:
+                data_file.write(BULK_FIELD_TERMINATOR.join(row) + BULK_ROW_TERMINATOR)
+        os.chmod(data_path, 0o644)  # mkstemp creates owner-only files; the SQL Server service needs read access
+
+        escaped_path = data_path.replace("'", "''")
         cursor.execute(f"""
-            INSERT INTO {table} (NAME_OF_PRESIDENT, DATE_OF_UNION_ADDRESS, LINK_TO_ADDRESS, FILENAME_ADDRESS, TEXT_OF_ADDRESS)
-            VALUES (?, ?, ?, ?, ?);
-            """, (name, str(date), link, file, text))
+            BULK INSERT {table} FROM '{escaped_path}'
+            WITH (DATAFILETYPE = 'widechar', FIELDTERMINATOR = '{BULK_FIELD_TERMINATOR}', ROWTERMINATOR = '{BULK_ROW_TERMINATOR}');
+            """)
+        cursor.commit()
         return True
-    except pyodbc.IntegrityError:
-        logger.warning(f"Duplicate record skipped during insert: {name} ({date})")
-        return False
     except Exception as e:
-        logger.error(f"Failed to insert record for {name} ({date}): {e}")
+        cursor.rollback()
+        logger.warning(f"BULK INSERT failed, falling back to batched inserts: {e}")
         return False
+    except OSError as e:
+        logger.warning(f"Failed to write BULK INSERT data file, falling back to batched inserts: {e}")
+        return False
+    finally:
+        if data_path is not None:
+            try:
+                os.remove(data_path)
+            except OSError as e:
+                logger.warning(f"Failed to remove BULK INSERT data file {data_path}: {e}")
 
 def write_to_file(output_directory, file_name, text):
     """Writes the speech to a local file on disk and returns the file path."""
     # Clean up the file name and construct the full file path
-    clean_file_name = file_name.replace(',', '').replace(' ', '_')
+    clean_file_name = file_name.translate(_FILENAME_TABLE)
     full_file_path = os.path.join(output_directory, f"{clean_file_name}.txt")
     # Write the speech text to the file
     with open(full_file_path, "w", encoding='utf-8') as text_file:
@@ -0,0 +1,83 @@
+"""
+Request pacing shared by the main scraper and the demo.
+
+Holds the token-bucket limiter, server rate-limit header parsing, and retry backoff
+so both scripts throttle the same way. Has no database dependencies.
+"""
+
+import asyncio
+import datetime
+import email.utils
+import random
+import threading
+import time
+
+RETRY_STATUSES = (429, 503)  # Responses meaning "slow down": retried after pausing every request
+
+
+class TokenBucket:
+    """Rate limiter: allows bursts of up to `capacity` requests, refilled at `rate` requests per second.
+
+    Safe to share between threads and between tasks on an event loop.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """Consumes a token if one is available. Returns 0 on success, otherwise the seconds to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if now >= self._paused_until and self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return max(self._paused_until - now, (1 - self._tokens) / self.rate)
+
+    def acquire(self):
+        """Blocks the calling thread until a request may be sent."""
+        while wait := self.try_acquire():
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Waits without blocking the event loop until a request may be sent."""
+        while wait := self.try_acquire():
+            await asyncio.sleep(wait)
+
+    def throttle(self, delay):
+        """Holds back all requests for `delay` seconds, e.g. when the server sends Retry-After."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            self._tokens = 0
+
+
+def rate_limit_delay(headers):
+    """Returns the number of seconds the server asked us to wait via Retry-After or X-RateLimit-* headers, or 0."""
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        if retry_after.isdigit():
+            return float(retry_after)
+        try:
+            retry_at = email.utils.parsedate_to_datetime(retry_after)
+            return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return 0.0
+
+    if headers.get('X-RateLimit-Remaining') == '0':
+        reset = headers.get('X-RateLimit-Reset', '')
+        if reset.isdigit():
+            # Servers send either seconds until reset or an epoch timestamp
+            reset = int(reset)
+            return float(reset) if reset < 1_000_000_000 else max(0.0, reset - time.time())
+    return 0.0
+
+
+def backoff_delay(attempt):
+    """Returns the exponential backoff with jitter to wait after failed attempt number `attempt` (0-based)."""
+    return min(60, 2 ** attempt) + random.random()